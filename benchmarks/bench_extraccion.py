@@ -0,0 +1,144 @@
+"""Mide el tiempo y la memoria pico de cada motor de extracción sobre páginas de listado guardadas.
+
+Uso:
+    python benchmarks/bench_extraccion.py [--repeticiones N] [--json resultados.json] [fixture.html ...]
+
+Sin argumentos usa todos los .html de benchmarks/fixtures/. Si la carpeta está vacía se generan
+listados sintéticos de varios tamaños. Para medir con páginas reales, guarda el HTML del listado
+(p. ej. con `curl -o benchmarks/fixtures/eltiempo_perros.html <url>`) y vuelve a ejecutar.
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extraccion import MOTORES, parsear_fecha  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+BASE_URL = "https://www.eltiempo.com/noticias/perros"
+
+# Número de <article> de los listados sintéticos
+TAMAÑOS_SINTETICOS = (10, 100, 1000)
+
+MESES_TEXTO = ("enero", "febrero", "marzo", "abril", "mayo", "junio", "julio",
+               "agosto", "septiembre", "octubre", "noviembre", "diciembre")
+
+
+def generar_listado(num_articulos, relleno=40, fecha=None):
+    """Genera un listado con la estructura del de El Tiempo y `relleno` nodos ajenos por artículo
+
+    Las fechas tienen el formato del listado real ("12 marzo de 2025"). Con `fecha` todas las noticias
+    llevan ese día; si no, se reparten a lo largo de 2025.
+    """
+    partes = ["<!DOCTYPE html><html><head><title>Perros</title>",
+              "<script>var datos = {};</script></head><body><header><nav>",
+              "".join(f"<a href='/seccion/{i}'>Sección {i}</a>" for i in range(50)),
+              "</nav></header><main>"]
+    for i in range(num_articulos):
+        dia_articulo = fecha or date(2025, i % 12 + 1, i % 28 + 1)
+        texto_fecha = f"{dia_articulo.day} {MESES_TEXTO[dia_articulo.month - 1]} de {dia_articulo.year}"
+        partes.append(
+            f"<article class='listing'><div class='img'><img src='/img/{i}.jpg' alt='foto {i}'></div>"
+            f"<h3 class='title'><a href='/vida/mascotas/noticia-{i}'>Noticia número {i} sobre perros</a></h3>"
+            f"<p class='epigraph'>Resumen de la noticia {i}.</p>"
+            f"<time datetime='{dia_articulo.isoformat()}'>{texto_fecha}</time></article>"
+        )
+        partes.append("<div class='ad'>" + "<span>publicidad</span>" * relleno + "</div>")
+    partes.append("</main><footer>" + "<p>Pie de página</p>" * 100 + "</footer></body></html>")
+    return "".join(partes)
+
+
+def asegurar_fixtures():
+    """Páginas guardadas en fixtures/ o, si no hay ninguna, listados sintéticos recién generados"""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    rutas = sorted(ruta for ruta in glob.glob(os.path.join(FIXTURES_DIR, "*.html"))
+                   if not os.path.basename(ruta).startswith("sintetico_"))
+    if rutas:
+        return rutas
+    # Se regeneran siempre para que un cambio en generar_listado no deje fixtures desfasados
+    for tamaño in TAMAÑOS_SINTETICOS:
+        ruta = os.path.join(FIXTURES_DIR, f"sintetico_{tamaño}.html")
+        with open(ruta, "w", encoding="utf-8") as archivo:
+            archivo.write(generar_listado(tamaño))
+        rutas.append(ruta)
+    return rutas
+
+
+def extraer_noticias_completo(html, base_url):
+    """Extracción original: árbol BeautifulSoup completo y búsquedas por artículo (referencia)"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    noticias = []
+    for articulo in soup.find_all("article"):
+        fecha_elemento = articulo.find("time")
+        if fecha_elemento and re.search(r'(\d{1,2})\s+([a-z]+)\s+de\s+(\d{4})', fecha_elemento.text.strip().lower()):
+            noticias.append((base_url + articulo.find("a")["href"], parsear_fecha(fecha_elemento.text)))
+    return noticias
+
+
+def medir(funcion, html, repeticiones):
+    """Devuelve (mejor tiempo en ms, memoria pico en KiB, número de noticias)"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion(html, BASE_URL)
+        tiempos.append(time.perf_counter() - inicio)
+
+    tracemalloc.start()
+    noticias = funcion(html, BASE_URL)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(tiempos) * 1000, pico / 1024, len(noticias)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("fixtures", nargs="*", help="Páginas HTML a medir")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    parser.add_argument("--json", help="Guarda los resultados en este archivo")
+    args = parser.parse_args()
+
+    motores = dict(MOTORES, completo=extraer_noticias_completo)
+    resultados = []
+    discrepancias = []
+    print(f"{'fixture':<28}{'KiB':>8}  {'motor':<10}{'ms':>10}{'pico KiB':>12}{'noticias':>10}")
+    for ruta in args.fixtures or asegurar_fixtures():
+        with open(ruta, encoding="utf-8") as archivo:
+            html = archivo.read()
+        totales = {}
+        for nombre, funcion in motores.items():
+            ms, pico, total = medir(funcion, html, args.repeticiones)
+            totales[nombre] = total
+            resultados.append({
+                "fixture": os.path.basename(ruta),
+                "bytes": len(html.encode("utf-8")),
+                "motor": nombre,
+                "ms": round(ms, 3),
+                "pico_kib": round(pico, 1),
+                "noticias": total,
+            })
+            print(f"{os.path.basename(ruta):<28}{len(html) // 1024:>8}  {nombre:<10}{ms:>10.2f}{pico:>12.1f}{total:>10}")
+        if len(set(totales.values())) > 1:
+            discrepancias.append((os.path.basename(ruta), totales))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+
+    # Tiempos de motores que no extraen lo mismo no son comparables
+    for fixture, totales in discrepancias:
+        print(f"ERROR: {fixture}: los motores devuelven distinto número de noticias: {totales}", file=sys.stderr)
+    if discrepancias:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Prueba de carga de punta a punta de publicar_noticias contra servidores locales falsos.
+
+Uso:
+    python benchmarks/bench_pipeline.py [--articulos 2 10 50 200] [--secuencial]
+                                        [--latencia-openai 0.5] [--latencia-unsplash 0.05]
+                                        [--latencia-wordpress 0.05] [--json resultados.json]
+
+Cada tamaño se ejecuta en un proceso aparte (configuración, índice y cachés limpios) y se informa
+de noticias por minuto, p50/p95 de cada etapa y memoria pico (RSS) del proceso.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from servidores_falsos import ServidoresFalsos  # noqa: E402
+
+
+def ejecutar_trabajador():
+    """Ejecuta el pipeline en este proceso e imprime el resumen de trazas como JSON"""
+    import resource
+
+    import cats_automatics_news
+    from trazas import trazas
+
+    inicio = time.perf_counter()
+    cats_automatics_news.publicar_noticias()
+    duracion = time.perf_counter() - inicio
+
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != "darwin":
+        maxrss *= 1024  # En Linux ru_maxrss está en KiB
+    resumen = trazas.resumen()
+    resumen.update(duracion_pipeline=duracion, pico_rss_bytes=maxrss)
+    print(json.dumps(resumen))
+
+
+def medir(articulos, args):
+    """Arranca los servidores falsos y ejecuta el pipeline con `articulos` noticias en un subproceso"""
+    with ServidoresFalsos(
+        articulos=articulos,
+        latencia_openai=args.latencia_openai,
+        latencia_unsplash=args.latencia_unsplash,
+        latencia_wordpress=args.latencia_wordpress,
+        bytes_imagen=args.bytes_imagen,
+    ) as servidores, tempfile.TemporaryDirectory() as directorio:
+        entorno = dict(os.environ, **servidores.entorno())
+        entorno.update(
+            PYTHONPATH=RAIZ + os.pathsep + entorno.get("PYTHONPATH", ""),
+            MAX_NOTICIAS=str(articulos),
+            MODO_CONCURRENTE="0" if args.secuencial else "1",
+            INDICE_NOTICIAS=os.path.join(directorio, "indice.db"),
+            CACHE_RESPUESTAS_DIR=os.path.join(directorio, "cache"),
+            OPENAI_BACKOFF="0.01",
+        )
+        proceso = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--trabajador"],
+            cwd=directorio, env=entorno, capture_output=True, text=True,
+        )
+        if proceso.returncode != 0:
+            raise RuntimeError(f"El pipeline falló con {articulos} noticias:\n{proceso.stderr}")
+        resumen = json.loads(proceso.stdout.strip().splitlines()[-1])
+        resumen["publicadas"] = len(servidores.wordpress.posts)
+        return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--articulos", type=int, nargs="+", default=[2, 10, 50, 200])
+    parser.add_argument("--secuencial", action="store_true", help="Usa el modo secuencial en lugar del concurrente")
+    parser.add_argument("--latencia-openai", type=float, default=0.5)
+    parser.add_argument("--latencia-unsplash", type=float, default=0.05)
+    parser.add_argument("--latencia-wordpress", type=float, default=0.05)
+    parser.add_argument("--bytes-imagen", type=int, default=200 * 1024)
+    parser.add_argument("--json", help="Guarda los resultados en este archivo")
+    parser.add_argument("--trabajador", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.trabajador:
+        return ejecutar_trabajador()
+
+    resultados = []
+    for articulos in args.articulos:
+        resumen = medir(articulos, args)
+        por_minuto = resumen["publicadas"] / resumen["duracion_pipeline"] * 60
+        resultados.append(dict(resumen, articulos=articulos, noticias_por_minuto=por_minuto))
+
+        print(f"\n{articulos} noticias: {resumen['publicadas']} publicadas en {resumen['duracion_pipeline']:.2f}s "
+              f"({por_minuto:.1f}/min), RSS pico {resumen['pico_rss_bytes'] / 2 ** 20:.1f} MiB")
+        print(f"  {'etapa':<28}{'llamadas':>10}{'p50 ms':>10}{'p95 ms':>10}{'errores':>10}")
+        for etapa, datos in resumen["etapas"].items():
+            print(f"  {etapa:<28}{datos['llamadas']:>10}{datos['p50'] * 1000:>10.1f}"
+                  f"{datos['p95'] * 1000:>10.1f}{datos['errores']:>10}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,245 @@
+"""Servidores locales que imitan El Tiempo, OpenAI, Unsplash y WordPress para pruebas de carga sin red."""
+import hashlib
+import io
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import parse_qs, urlparse
+from xmlrpc.server import SimpleXMLRPCRequestHandler, SimpleXMLRPCServer
+
+from bench_extraccion import generar_listado
+
+
+def generar_jpeg(bytes_aproximados):
+    """JPEG válido de unos `bytes_aproximados` con ruido suavizado (se comprime como una foto), o None sin Pillow"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+
+    def codificar(ancho, alto):
+        canales = [Image.effect_noise((ancho // 16, alto // 16), 40 + 20 * i).resize((ancho, alto), Image.BICUBIC)
+                   for i in range(3)]
+        salida = io.BytesIO()
+        Image.merge("RGB", canales).save(salida, "JPEG", quality=85)
+        return salida.getvalue()
+
+    # Se calibra con una muestra pequeña y se escala en proporción 3:2
+    bytes_por_pixel = len(codificar(480, 320)) / (480 * 320)
+    alto = max(32, int((bytes_aproximados / bytes_por_pixel / 1.5) ** 0.5))
+    return codificar(int(alto * 1.5), alto)
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, como los servicios reales
+
+    def log_message(self, *args):
+        pass
+
+    def responder(self, cuerpo, tipo="application/json", estado=200, cabeceras=None):
+        if isinstance(cuerpo, str):
+            cuerpo = cuerpo.encode("utf-8")
+        self.send_response(estado)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(cuerpo)))
+        for clave, valor in (cabeceras or {}).items():
+            self.send_header(clave, valor)
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def leer_cuerpo(self):
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+
+class _ServidorHTTP(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, manejador, latencia=0.0, **opciones):
+        super().__init__(("127.0.0.1", 0), manejador)
+        self.latencia = latencia
+        self.opciones = opciones
+        self.contador = itertools.count(1)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class _ManejadorListado(_Manejador):
+    def do_GET(self):
+        time.sleep(self.server.latencia)
+        # Todas las noticias son de hoy para que el script las considere nuevas
+        html = generar_listado(self.server.opciones["articulos"], relleno=0, fecha=date.today())
+        etag = '"' + hashlib.sha1(html.encode("utf-8")).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.responder(html, "text/html; charset=utf-8", cabeceras={"ETag": etag})
+
+
+class _ManejadorOpenAI(_Manejador):
+    def do_POST(self):
+        peticion = json.loads(self.leer_cuerpo())
+        prompt = peticion["messages"][-1]["content"]
+        time.sleep(self.server.latencia)
+
+        parrafos = "".join(f"<p>Párrafo {i} del artículo de prueba sobre perros.</p>" for i in range(40))
+        if "objeto JSON" in prompt:
+            contenido = json.dumps({
+                "titulo": f"Artículo de prueba {next(self.server.contador)}",
+                "contenido": f"<h2>Subtítulo</h2>{parrafos}",
+                "palabra_clave": "cachorro",
+            })
+        elif "palabra clave" in prompt:
+            contenido = "cachorro"
+        else:
+            contenido = f"<h1>Artículo de prueba {next(self.server.contador)}</h1><h2>Subtítulo</h2>{parrafos}"
+
+        self.responder(json.dumps({
+            "id": "chatcmpl-prueba",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": peticion.get("model", "gpt-4"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": contenido}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(contenido) // 4,
+                      "total_tokens": (len(prompt) + len(contenido)) // 4},
+        }))
+
+
+class _ManejadorUnsplash(_Manejador):
+    def do_GET(self):
+        ruta = urlparse(self.path)
+        time.sleep(self.server.latencia)
+        if ruta.path == "/search/photos":
+            consulta = parse_qs(ruta.query).get("query", [""])[0]
+            resultados = [
+                {"id": f"{consulta}-{i}", "urls": {"raw": f"{self.server.url}/imagenes/{next(self.server.contador)}.jpg?ixid=prueba"}}
+                for i in range(10)
+            ]
+            self.responder(json.dumps({"total": len(resultados), "results": resultados}))
+        elif ruta.path.startswith("/imagenes/"):
+            # Contenido distinto por imagen para que la caché de medios no oculte las subidas
+            semilla = hashlib.sha256(ruta.path.encode("utf-8")).digest()
+            jpeg = self.server.opciones["jpeg"]
+            if jpeg:
+                # Los decodificadores ignoran lo que sigue al marcador de fin de imagen
+                self.responder(jpeg + semilla, "image/jpeg")
+            else:
+                tamaño = self.server.opciones["bytes_imagen"]
+                self.responder((semilla * (tamaño // len(semilla) + 1))[:tamaño], "image/jpeg")
+        else:
+            self.responder("{}", estado=404)
+
+
+class _ManejadorXMLRPC(SimpleXMLRPCRequestHandler):
+    rpc_paths = ("/xmlrpc.php",)
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+
+class _ServidorWordPress(ThreadingMixIn, SimpleXMLRPCServer):
+    daemon_threads = True
+
+    def __init__(self, latencia=0.0):
+        super().__init__(("127.0.0.1", 0), _ManejadorXMLRPC, allow_none=True, logRequests=False)
+        self.latencia = latencia
+        self.contador = itertools.count(1)
+        self.lock = threading.Lock()
+        self.posts = {}
+        self.medios = {}
+        for nombre in ("wp.newPost", "wp.getPosts", "wp.uploadFile", "wp.setPostThumbnail"):
+            self.register_function(self._con_latencia(getattr(self, "_" + nombre.split(".")[1])), nombre)
+        self.register_function(lambda: ["wp.newPost", "wp.getPosts", "wp.uploadFile", "wp.setPostThumbnail",
+                                        "mt.supportedMethods"], "mt.supportedMethods")
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/xmlrpc.php"
+
+    def _con_latencia(self, funcion):
+        def envoltura(*args):
+            time.sleep(self.latencia)
+            return funcion(*args)
+        return envoltura
+
+    def _newPost(self, blog_id, usuario, clave, contenido):
+        with self.lock:
+            post_id = str(next(self.contador))
+            self.posts[post_id] = dict(contenido, post_id=post_id)
+        return post_id
+
+    def _getPosts(self, blog_id, usuario, clave, filtro=None, campos=None):
+        with self.lock:
+            posts = list(self.posts.values())
+        return posts[-int((filtro or {}).get("number", 10)):]
+
+    def _uploadFile(self, blog_id, usuario, clave, datos):
+        with self.lock:
+            medio_id = str(next(self.contador))
+            self.medios[medio_id] = len(datos["bits"].data)
+        return {"id": medio_id, "file": datos["name"], "url": f"{self.url}/{datos['name']}", "type": datos["type"]}
+
+    def _setPostThumbnail(self, post_id, thumbnail_id):
+        with self.lock:
+            self.posts.setdefault(str(post_id), {})["post_thumbnail"] = thumbnail_id
+        return True
+
+
+class ServidoresFalsos:
+    """Arranca los cuatro servicios falsos en hilos y expone las variables de entorno para apuntarles"""
+
+    def __init__(self, articulos=2, latencia_openai=0.0, latencia_unsplash=0.0, latencia_wordpress=0.0,
+                 latencia_listado=0.0, bytes_imagen=200 * 1024):
+        self.listado = _ServidorHTTP(_ManejadorListado, latencia_listado, articulos=articulos)
+        self.openai = _ServidorHTTP(_ManejadorOpenAI, latencia_openai)
+        # Sin Pillow se sirven bytes que no son una imagen y el script sube la original sin redimensionar
+        self.unsplash = _ServidorHTTP(_ManejadorUnsplash, latencia_unsplash, bytes_imagen=bytes_imagen,
+                                      jpeg=generar_jpeg(bytes_imagen))
+        self.wordpress = _ServidorWordPress(latencia_wordpress)
+        self.servidores = (self.listado, self.openai, self.unsplash, self.wordpress)
+        self.hilos = []
+
+    def __enter__(self):
+        for servidor in self.servidores:
+            hilo = threading.Thread(target=servidor.serve_forever, daemon=True)
+            hilo.start()
+            self.hilos.append(hilo)
+        return self
+
+    def __exit__(self, *exc):
+        for servidor in self.servidores:
+            servidor.shutdown()
+            servidor.server_close()
+
+    def entorno(self):
+        """Variables de entorno que redirigen cats_automatics_news.py a estos servidores"""
+        return {
+            "URL_NOTICIAS": f"{self.listado.url}/noticias/perros",
+            "OPENAI_BASE_URL": f"{self.openai.url}/v1",
+            "OPENAI_API_KEY": "clave-de-prueba",
+            "UNSPLASH_API_URL": self.unsplash.url,
+            "UNSPLASH_ACCESS_KEY": "clave-de-prueba",
+            "WP_URL": self.wordpress.url,
+            "WP_USER": "prueba",
+            "WP_PASSWORD": "prueba",
+        }
+
+
+if __name__ == "__main__":
+    with ServidoresFalsos(articulos=int(os.getenv("ARTICULOS", "10"))) as servidores:
+        for clave, valor in servidores.entorno().items():
+            print(f"export {clave}={valor}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+
+# Carpeta, antigüedad máxima (segundos) y tamaño máximo (bytes) de la caché de respuestas de OpenAI
+CACHE_DIR = os.getenv("CACHE_RESPUESTAS_DIR", ".cache_respuestas")
+CACHE_TTL = int(os.getenv("CACHE_RESPUESTAS_TTL", str(7 * 24 * 3600)))
+CACHE_MAX_BYTES = int(os.getenv("CACHE_RESPUESTAS_MAX_BYTES", str(50 * 1024 * 1024)))
+
+
+def clave_cache(modelo, prompt, url_fuente):
+    """Clave de contenido para (modelo, hash del prompt, URL de la noticia)"""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{modelo}\n{prompt_hash}\n{url_fuente}".encode("utf-8")).hexdigest()
+
+
+class CacheRespuestas:
+    """Caché en disco de respuestas del modelo, con expiración por antigüedad y límite de tamaño"""
+
+    def __init__(self, directorio=None, ttl=None, max_bytes=None):
+        self.directorio = directorio or CACHE_DIR
+        self.ttl = CACHE_TTL if ttl is None else ttl
+        self.max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(self.directorio, exist_ok=True)
+
+    def _ruta(self, clave):
+        return os.path.join(self.directorio, f"{clave}.json")
+
+    def obtener(self, clave):
+        """Devuelve la respuesta guardada o None si no existe o ha expirado"""
+        ruta = self._ruta(clave)
+        try:
+            if time.time() - os.path.getmtime(ruta) > self.ttl:
+                os.remove(ruta)
+                return None
+            with open(ruta, encoding="utf-8") as archivo:
+                return json.load(archivo)["respuesta"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def guardar(self, clave, respuesta, **metadatos):
+        """Guarda una respuesta de forma atómica y aplica la política de expulsión"""
+        ruta = self._ruta(clave)
+        temporal = f"{ruta}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporal, "w", encoding="utf-8") as archivo:
+                json.dump(dict(metadatos, respuesta=respuesta, creado=time.time()), archivo, ensure_ascii=False)
+            os.replace(temporal, ruta)
+        except OSError as e:
+            logging.warning("No se pudo guardar la respuesta en caché: %s", e)
+            return
+        self.purgar()
+
+    def purgar(self):
+        """Elimina las entradas expiradas y, si se supera el tamaño máximo, las más antiguas"""
+        with self._lock:
+            ahora = time.time()
+            entradas = []
+            for nombre in os.listdir(self.directorio):
+                if not nombre.endswith(".json"):
+                    continue
+                ruta = os.path.join(self.directorio, nombre)
+                try:
+                    estado = os.stat(ruta)
+                    if ahora - estado.st_mtime > self.ttl:
+                        os.remove(ruta)
+                    else:
+                        entradas.append((estado.st_mtime, estado.st_size, ruta))
+                except OSError:
+                    continue
+
+            total = sum(tamaño for _, tamaño, _ in entradas)
+            for _, tamaño, ruta in sorted(entradas):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(ruta)
+                    total -= tamaño
+                except OSError:
+                    continue
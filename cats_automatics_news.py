@@ -1,17 +1,25 @@
 import os
 import logging
+import argparse
+import sys
 import requests
-from bs4 import BeautifulSoup
 from dotenv import load_dotenv
-from wordpress_xmlrpc import Client, WordPressPost
-from wordpress_xmlrpc.methods.posts import NewPost, GetPosts, EditPost
-from wordpress_xmlrpc.methods.media import UploadFile
-from wordpress_xmlrpc.compat import xmlrpc_client
-import openai
+import xmlrpc.client as xmlrpc_client
 import re
+import json
+import time
 from datetime import datetime, timedelta
-import pytz
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager, nullcontext
+from cache_respuestas import CacheRespuestas, clave_cache
+from extraccion import extraer_noticias
+from fuentes import fuente_por_defecto
+from indice_noticias import IndiceNoticias
+from medios import descargar_imagen, nombre_archivo, redimensionar_imagen
+from transporte import TransporteXMLRPC, metricas, obtener_sesion
+from trazas import escribir_reportes, perfilar, trazar, trazas
 
 # Cargar variables de entorno
 load_dotenv()
@@ -26,48 +34,64 @@ WP_PASSWORD = os.getenv("WP_PASSWORD")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 UNSPLASH_ACCESS_KEY = os.getenv("UNSPLASH_ACCESS_KEY")
 
-# Configuración de OpenAI
-openai.api_key = OPENAI_API_KEY
-
-# Zona horaria específica
-TIMEZONE = pytz.timezone("America/Bogota")  # Cambia esto a la zona horaria que necesites
-
-def obtener_noticias():
-    """Obtiene noticias nuevas de El Tiempo"""
+# URLs base de los servicios externos (se pueden apuntar a servidores locales para pruebas de carga)
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL") or None
+UNSPLASH_API_URL = os.getenv("UNSPLASH_API_URL", "https://api.unsplash.com")
+
+# Zona horaria específica (openai, pytz y wordpress_xmlrpc se importan al usarse para arrancar rápido)
+TIMEZONE = "America/Bogota"  # Cambia esto a la zona horaria que necesites
+
+# Configuración de ejecución concurrente
+MAX_NOTICIAS = int(os.getenv("MAX_NOTICIAS", "2"))  # Máximo de noticias nuevas por ejecución
+MODO_CONCURRENTE = os.getenv("MODO_CONCURRENTE", "0") == "1"  # Procesa cada noticia como una tarea independiente
+CONCURRENCIA_OPENAI = int(os.getenv("CONCURRENCIA_OPENAI", "2"))  # Llamadas simultáneas a OpenAI
+CONCURRENCIA_UNSPLASH = int(os.getenv("CONCURRENCIA_UNSPLASH", "4"))  # Llamadas simultáneas a Unsplash
+CONCURRENCIA_WORDPRESS = int(os.getenv("CONCURRENCIA_WORDPRESS", "2"))  # Llamadas simultáneas a WordPress
+
+# Configuración de generación de contenido
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4")
+GENERACION_ESTRUCTURADA = os.getenv("GENERACION_ESTRUCTURADA", "0") == "1"  # Título, contenido y palabra clave en una sola llamada
+MAX_REINTENTOS_OPENAI = int(os.getenv("MAX_REINTENTOS_OPENAI", "3"))
+OPENAI_BACKOFF = float(os.getenv("OPENAI_BACKOFF", "2"))  # Segundos de espera base entre reintentos
+SISTEMA_ARTICULO = "Eres un asistente experto en redacción de artículos SEO y conocedor de todo lo relacionado con perros."
+PALABRAS_CLAVE_EXCLUIDAS = ("perro", "perros")
+
+_cliente_openai = None
+_cache_respuestas = None
+_recursos_openai_lock = threading.Lock()
+
+URL_NOTICIAS = os.getenv("URL_NOTICIAS", "https://www.eltiempo.com/noticias/perros")
+FUENTE_POR_DEFECTO = fuente_por_defecto(URL_NOTICIAS, MAX_NOTICIAS)
+
+@trazar("obtener_noticias")
+def obtener_noticias(indice=None, fuente=None):
+    """Obtiene noticias nuevas de la fuente (El Tiempo por defecto) que aún no se han publicado"""
+    import pytz
+
+    indice = indice or IndiceNoticias()
+    fuente = fuente or FUENTE_POR_DEFECTO
     try:
-        response = requests.get("https://www.eltiempo.com/noticias/perros")
+        response = obtener_sesion().get(fuente.url, headers=indice.cabeceras_condicionales(fuente.url))
+        if response.status_code == 304:
+            # La página no ha cambiado: solo se reintentan las pendientes de ejecuciones anteriores
+            logging.info("La página de noticias %s no ha cambiado desde la última ejecución.", fuente.nombre)
+            return indice.pendientes(fuente.nombre)[:fuente.max_noticias]
         response.raise_for_status()
-        soup = BeautifulSoup(response.text, "html.parser")
-
-        noticias = []
-        ayer = (datetime.now(TIMEZONE) - timedelta(days=1)).strftime("%d/%m/%Y")
-        logging.info("Fecha de ayer: %s", ayer)
-        
-        for articulo in soup.find_all("article"):
-            fecha_elemento = articulo.find("time")
-            if fecha_elemento:
-                fecha_texto = fecha_elemento.text.strip().lower()
-                logging.info("Fecha del artículo: %s", fecha_texto)
-                # Extraer la fecha del texto del artículo
-                match = re.search(r'(\d{1,2})\s+([a-z]+)\s+de\s+(\d{4})', fecha_texto)
-                if match:
-                    dia, mes, año = match.groups()
-                    # Convertir el mes a número
-                    meses = {
-                        'enero': '01', 'febrero': '02', 'marzo': '03', 'abril': '04',
-                        'mayo': '05', 'junio': '06', 'julio': '07', 'agosto': '08',
-                        'septiembre': '09', 'octubre': '10', 'noviembre': '11', 'diciembre': '12'
-                    }
-                    mes_numero = meses.get(mes)
-                    fecha_articulo = f"{dia.zfill(2)}/{mes_numero}/{año}"
-                    logging.info("Fecha del artículo formateada: %s", fecha_articulo)
-                    if fecha_articulo == ayer:  # Verifica que la fecha sea de ayer
-                        link = articulo.find("a")["href"]
-                        noticia_url = "https://www.eltiempo.com" + link
-                        noticias.append(noticia_url)
-
-        noticias = noticias[:2]  # Máximo 2 noticias nuevas por ejecución
-        logging.info("Noticias obtenidas del día anterior: %d", len(noticias))
+
+        # Solo interesan las noticias desde la última publicada (o desde ayer en la primera ejecución)
+        ayer = (datetime.now(pytz.timezone(TIMEZONE)) - timedelta(days=1)).date()
+        desde = indice.marca_de_agua(fuente.nombre) or ayer
+        logging.info("Buscando noticias de %s desde: %s", fuente.nombre, desde)
+
+        recientes = [(noticia.url, noticia.fecha) for noticia in extraer_noticias(response.text, fuente.url)
+                     if noticia.fecha >= desde]
+        for url in indice.registrar_varias(recientes, fuente.nombre):
+            logging.info("Noticia nueva registrada: %s", url)
+
+        indice.guardar_cabeceras(fuente.url, response)
+
+        noticias = indice.pendientes(fuente.nombre)[:fuente.max_noticias]  # Máximo de noticias nuevas por ejecución
+        logging.info("Noticias pendientes de publicar en %s: %d", fuente.nombre, len(noticias))
 
         return noticias
 
@@ -75,9 +99,99 @@ def obtener_noticias():
         logging.error("Error al obtener noticias: %s", e)
         return []
 
-def generar_contenido_chatgpt(noticia):
-    """Genera contenido optimizado para SEO basado en la noticia"""
-    client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+def obtener_cliente_openai():
+    """Devuelve el cliente de OpenAI compartido (mantiene su pool de conexiones entre llamadas)"""
+    global _cliente_openai
+    import openai
+
+    with _recursos_openai_lock:
+        if _cliente_openai is None:
+            # Los reintentos los controla completar_chat para que el límite sea uno solo
+            _cliente_openai = openai.OpenAI(api_key=OPENAI_API_KEY, base_url=OPENAI_BASE_URL, max_retries=0)
+        return _cliente_openai
+
+def completar_chat(sistema, prompt, validar, url_fuente="", limite=None):
+    """Llama al modelo con reintentos acotados y caché en disco.
+
+    `validar` recibe el texto de la respuesta y devuelve el valor útil o None si no es aceptable.
+    `limite` es el semáforo de OpenAI que ya tiene tomado quien llama; se cede durante la espera entre reintentos.
+    Devuelve ese valor, o None si ningún intento produjo una respuesta válida.
+    """
+    import openai
+
+    cache = obtener_cache_respuestas()
+    clave = clave_cache(OPENAI_MODEL, sistema + "\n" + prompt, url_fuente)
+    guardado = cache.obtener(clave)
+    if guardado is not None:
+        resultado = validar(guardado)
+        if resultado is not None:
+            logging.info("Respuesta de OpenAI obtenida de la caché: %s", url_fuente or clave[:12])
+            trazas.sumar("openai.cache_aciertos")
+            return resultado
+
+    client = obtener_cliente_openai()
+    # Solo se reintentan los errores pasajeros; una petición inválida (400) o sin permisos (401/403) no mejora
+    reintentables = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+    for intento in range(1, MAX_REINTENTOS_OPENAI + 1):
+        if intento > 1:
+            trazas.sumar("openai.reintentos")
+        try:
+            response = client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=[
+                    {"role": "system", "content": sistema},
+                    {"role": "user", "content": prompt}
+                ]
+            )
+        except reintentables as e:
+            logging.warning("Error de OpenAI (intento %d/%d): %s", intento, MAX_REINTENTOS_OPENAI, e)
+            if intento == MAX_REINTENTOS_OPENAI:
+                raise
+        else:
+            if response.usage:
+                trazas.sumar("openai.tokens_prompt", response.usage.prompt_tokens)
+                trazas.sumar("openai.tokens_respuesta", response.usage.completion_tokens)
+            contenido = response.choices[0].message.content.strip()
+            resultado = validar(contenido)
+            if resultado is not None:
+                cache.guardar(clave, contenido, modelo=OPENAI_MODEL, url=url_fuente)
+                return resultado
+            logging.warning("Respuesta de OpenAI no válida (intento %d/%d)", intento, MAX_REINTENTOS_OPENAI)
+
+        if intento < MAX_REINTENTOS_OPENAI:
+            espera = OPENAI_BACKOFF * 2 ** (intento - 1) + random.uniform(0, OPENAI_BACKOFF)
+            if limite is None:
+                time.sleep(espera)
+            else:
+                # Mientras espera, el cupo de OpenAI queda libre para los demás hilos
+                limite.release()
+                try:
+                    time.sleep(espera)
+                finally:
+                    with trazas.span("espera_openai"):
+                        limite.acquire()
+
+    return None
+
+def obtener_cache_respuestas():
+    """Devuelve la caché de respuestas compartida"""
+    global _cache_respuestas
+    with _recursos_openai_lock:
+        if _cache_respuestas is None:
+            _cache_respuestas = CacheRespuestas()
+        return _cache_respuestas
+
+@trazar("arranque_openai")
+def preparar_openai():
+    """Importa openai y crea su cliente y la caché de respuestas antes de generar, para que ese coste
+    quede en su propia etapa y no en la primera generación"""
+    obtener_cliente_openai()
+    obtener_cache_respuestas()
+
+def prompt_articulo(noticia, fuente=None):
+    """Prompt con las instrucciones de redacción del artículo"""
+    if fuente is not None and fuente.prompt:
+        return fuente.prompt.replace("{noticia}", noticia)
 
     prompt = f"""
     Escribe un artículo original sobre perros basado en la siguiente noticia: {noticia}
@@ -94,27 +208,69 @@ def generar_contenido_chatgpt(noticia):
 
     Si es relevante, incluye un hipervínculo a la fuente de la noticia: <a href='https://www.eltiempo.com/noticias/perros' target='_blank'>El Tiempo</a>.
     """
-    
-    while True:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "Eres un asistente experto en redacción de artículos SEO y conocedor de todo lo relacionado con perros."},
-                {"role": "user", "content": prompt}
-            ]
-        )
+    return prompt
 
-        contenido = response.choices[0].message.content.strip()
-
-        # Verificar si el contenido incluye un título dentro de <h1>
-        if re.search(r'<h1>(.*?)</h1>', contenido, re.IGNORECASE):
-            break  # Salir del bucle si se encuentra un título
+@trazar("generar_contenido_chatgpt")
+def generar_contenido_chatgpt(noticia, fuente=None, limite=None):
+    """Genera contenido optimizado para SEO basado en la noticia"""
+    # Verificar si el contenido incluye un título dentro de <h1>
+    contenido = completar_chat(
+        SISTEMA_ARTICULO,
+        prompt_articulo(noticia, fuente),
+        lambda texto: texto if re.search(r'<h1>(.*?)</h1>', texto, re.IGNORECASE) else None,
+        url_fuente=noticia,
+        limite=limite,
+    )
+    if contenido is None:
+        raise ValueError(f"No se obtuvo un artículo con título <h1> para {noticia}")
 
     # Asegurarse de que los encabezados h1, h2, h3 tengan la primera letra mayúscula y el resto minúscula
     contenido = formatear_encabezados_html(contenido)
     
     return contenido
 
+def validar_articulo_json(texto):
+    """Valida la respuesta estructurada y devuelve (titulo, contenido, palabra_clave) o None"""
+    texto = re.sub(r'^```(?:json)?\s*|\s*```$', '', texto.strip())
+    try:
+        datos = json.loads(texto)
+    except ValueError:
+        return None
+    if not isinstance(datos, dict):
+        return None
+
+    titulo = str(datos.get("titulo", "")).strip()
+    contenido = str(datos.get("contenido", "")).strip()
+    palabra_clave = str(datos.get("palabra_clave", "")).strip().lower()
+    if not titulo or not contenido or not palabra_clave or palabra_clave in PALABRAS_CLAVE_EXCLUIDAS:
+        return None
+
+    contenido = re.sub(r'<h1>.*?</h1>', '', contenido, count=1, flags=re.IGNORECASE | re.DOTALL)
+    return titulo.capitalize(), formatear_encabezados_html(contenido.strip()), palabra_clave
+
+@trazar("generar_articulo")
+def generar_articulo(noticia, fuente=None, limite=None):
+    """Genera título, contenido HTML y palabra clave de imagen en una sola llamada estructurada"""
+    prompt = prompt_articulo(noticia, fuente) + """
+    Devuelve únicamente un objeto JSON, sin texto adicional, con estas claves:
+    "titulo": el título del artículo, sin etiquetas HTML.
+    "contenido": el cuerpo del artículo en HTML, sin el <h1> del título.
+    "palabra_clave": una sola palabra clave relevante para buscar una imagen en Unsplash que NO sea ni "perro" ni "perros".
+    """
+    resultado = completar_chat(SISTEMA_ARTICULO, prompt, validar_articulo_json, url_fuente=noticia, limite=limite)
+    if resultado is None:
+        raise ValueError(f"No se obtuvo una respuesta estructurada válida para {noticia}")
+    logging.info("Palabra clave generada: %s", resultado[2])
+    return resultado
+
+def generar_noticia(noticia, fuente=None, limite=None):
+    """Devuelve (titulo, contenido_limpio, palabra_clave); la palabra clave es None si aún no se generó"""
+    if GENERACION_ESTRUCTURADA:
+        return generar_articulo(noticia, fuente, limite)
+    contenido = generar_contenido_chatgpt(noticia, fuente, limite)
+    titulo, contenido_limpio = extraer_titulo_y_limpiar(contenido)  # Extrae título y limpia el contenido
+    return titulo, contenido_limpio, None
+
 def formatear_encabezados_html(contenido):
     """Formatea los encabezados h1, h2 y h3 para que tengan la primera letra en mayúscula y el resto en minúscula."""
     # Usar expresiones regulares para encontrar los encabezados h1, h2 y h3
@@ -132,36 +288,31 @@ def extraer_titulo_y_limpiar(contenido):
     
     return "Noticia sobre perros", contenido  # Si no hay <h1>, usa un título genérico
 
-def generar_palabra_clave(titulo):
+@trazar("generar_palabra_clave")
+def generar_palabra_clave(titulo, limite=None):
     """Genera una palabra clave basada en el título de la noticia usando ChatGPT"""
-    client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
     prompt = f"""
     Basado en el siguiente título de una noticia sobre perros, proporciona una sola palabra clave relevante para buscar una imagen en Unsplash que NO sea ni "perro" ni "perros": {titulo}
     """
-    
-    while True:
-        response = client.chat.completions.create(
-            model="gpt-4",
-            messages=[
-                {"role": "system", "content": "Eres un asistente experto en redacción de artículos SEO."},
-                {"role": "user", "content": prompt}
-            ]
-        )
-
-        palabra_clave = response.choices[0].message.content.strip().lower()
+
+    def validar(texto):
+        palabra_clave = texto.lower()
         logging.info("Palabra clave generada: %s", palabra_clave)
-        
-        if palabra_clave not in ["perro", "perros"]:
-            break  # Salir del bucle si la palabra clave es diferente de "perro" o "perros"
+        return palabra_clave if palabra_clave not in PALABRAS_CLAVE_EXCLUIDAS else None
+
+    palabra_clave = completar_chat("Eres un asistente experto en redacción de artículos SEO.", prompt, validar, limite=limite)
+    if palabra_clave is None:
+        logging.warning("No se obtuvo una palabra clave válida para: %s", titulo)
+        return ""
     
     return palabra_clave
 
+@trazar("buscar_imagen_unsplash")
 def buscar_imagen_unsplash(query, width=1200, height=630):
     """Busca una imagen en Unsplash basada en la consulta y ajusta el tamaño"""
-    url = f"https://api.unsplash.com/search/photos?query={query}&client_id={UNSPLASH_ACCESS_KEY}"
+    url = f"{UNSPLASH_API_URL}/search/photos?query={query}&client_id={UNSPLASH_ACCESS_KEY}"
     try:
-        response = requests.get(url)
+        response = obtener_sesion().get(url)
         response.raise_for_status()
         data = response.json()
         if data["results"]:
@@ -177,21 +328,42 @@ def buscar_imagen_unsplash(query, width=1200, height=630):
         logging.error("Error al buscar imagen en Unsplash: %s", e)
         return ""
 
-def subir_imagen(client, imagen_url):
-    """Sube una imagen a la biblioteca de medios de WordPress y devuelve el ID de la imagen"""
+@trazar("subir_imagen")
+def subir_imagen(client, imagen_url, indice=None, limite=None):
+    """Sube una imagen a la biblioteca de medios de WordPress y devuelve el ID de la imagen
+
+    Si ya se subió una imagen con el mismo contenido se reutiliza su ID. `limite` acota solo la
+    llamada a WordPress (la descarga y el redimensionado quedan fuera).
+    """
+    from wordpress_xmlrpc.methods.media import UploadFile
+
+    imagen = redimensionada = None
     try:
-        response = requests.get(imagen_url)
-        response.raise_for_status()
-        image_data = response.content
+        imagen = descargar_imagen(imagen_url)
+        trazas.sumar("imagenes.bytes_descargados", imagen.tamaño)
+
+        if indice is not None:
+            imagen_id = indice.obtener_medio(imagen.sha256)
+            if imagen_id:
+                logging.info("Imagen ya subida anteriormente, se reutiliza el ID %s", imagen_id)
+                trazas.sumar("wordpress.imagenes_reutilizadas")
+                return imagen_id
+
+        redimensionada = redimensionar_imagen(imagen)
+        logging.info("Imagen descargada: %d bytes, a subir: %d bytes", imagen.tamaño, redimensionada.tamaño)
+        trazas.sumar("wordpress.bytes_subidos", redimensionada.tamaño)
 
         data = {
-            'name': 'imagen.jpg',
-            'type': 'image/jpeg',  # Cambia esto si la imagen no es JPEG
-            'bits': xmlrpc_client.Binary(image_data),
-            'overwrite': True
+            'name': nombre_archivo(redimensionada),
+            'type': redimensionada.tipo,
+            'bits': xmlrpc_client.Binary(redimensionada.leer()),
+            'overwrite': False
         }
 
-        response = client.call(UploadFile(data))
+        with limite or nullcontext():
+            response = client.call(UploadFile(data))
+        if indice is not None:
+            indice.guardar_medio(imagen.sha256, response['id'], response.get('url'))
         return response['id']
     except requests.exceptions.RequestException as e:
         logging.error("Error al descargar la imagen: %s", e)
@@ -199,64 +371,190 @@ def subir_imagen(client, imagen_url):
     except Exception as e:
         logging.error("Error al subir la imagen a WordPress: %s", e)
         return None
-
-def set_post_thumbnail(client, post_id, thumbnail_id):
-    """Establece la imagen destacada de una publicación"""
-    try:
-        client.call(xmlrpc_client.Method('wp.setPostThumbnail'), post_id, thumbnail_id)
-    except Exception as e:
-        logging.error("Error al establecer la imagen destacada: %s", e)
-
-def publicar_noticias():
-    """Obtiene noticias, genera contenido y lo publica en WordPress"""
-    client = Client(WP_URL, WP_USER, WP_PASSWORD)
-    noticias = obtener_noticias()
+    finally:
+        for archivo in {imagen, redimensionada} - {None}:
+            archivo.eliminar()
+
+def publicar_noticias(concurrente=None, indice=None, fuente=None):
+    """Obtiene noticias, genera contenido y lo publica en WordPress. Devuelve cuántas noticias fallaron"""
+    if concurrente is None:
+        concurrente = MODO_CONCURRENTE
+    indice = indice or IndiceNoticias()
+    if concurrente:
+        return publicar_noticias_concurrente(indice=indice, fuente=fuente)
+
+    noticias = obtener_noticias(indice, fuente)
     if not noticias:
-        logging.info("No se encontraron noticias del día anterior.")
-        return
+        logging.info("No se encontraron noticias nuevas.")
+        return 0
 
+    preparar_openai()
+    # Un solo hilo: cada servicio recibe como mucho una llamada a la vez
+    limites = LimitesServicios(openai_max=1, unsplash_max=1, wordpress_max=1)
     titulos_generados = []
+    errores = 0
 
     for noticia in noticias:
-        contenido = generar_contenido_chatgpt(noticia)
-        titulo, contenido_limpio = extraer_titulo_y_limpiar(contenido)  # Extrae título y limpia el contenido
-        titulos_generados.append(titulo)
-
-        post = WordPressPost()
-        post.title = titulo  # Usa el título real extraído del <h1>
-        post.content = contenido_limpio  # Usa el contenido sin <h1>
-        post.post_status = "publish"
-        post.terms_names = {"category": ["Noticias"]}  # Asegúrate de que la categoría existe
-        
-        post_id = client.call(NewPost(post))
-
-        logging.info("Noticia publicada: %s con título: %s", noticia, titulo)
-
-    # Guardar los títulos generados en un archivo
+        try:
+            titulos_generados.append(procesar_noticia(noticia, limites, indice, fuente))
+        except Exception as e:
+            logging.error("Error al procesar la noticia %s: %s", noticia, e)
+            errores += 1
+
+    guardar_titulos(titulos_generados)
+    metricas.registrar_en_log()
+    return errores
+
+def crear_post(titulo, contenido_limpio, imagen_id=None, categoria="Noticias"):
+    """Construye la entrada de WordPress para una noticia generada"""
+    from wordpress_xmlrpc import WordPressPost
+
+    post = WordPressPost()
+    post.title = titulo  # Usa el título real extraído del <h1>
+    post.content = contenido_limpio  # Usa el contenido sin <h1>
+    post.post_status = "publish"
+    post.terms_names = {"category": [categoria]}  # Asegúrate de que la categoría existe
+    if imagen_id:
+        post.thumbnail = imagen_id  # La imagen destacada se asigna al crear la entrada
+    return post
+
+def guardar_titulos(titulos_generados):
+    """Guarda los títulos generados en un archivo"""
     with open("titulos_generados.txt", "w") as file:
         for titulo in titulos_generados:
             file.write(titulo + "\n")
 
-    # Actualizar entradas con imágenes de Unsplash
-    actualizar_noticias(client, titulos_generados)
+@contextmanager
+def esperar_turno(limite, etapa):
+    """Toma el semáforo registrando la espera como su propia etapa, y lo libera al salir del bloque"""
+    with trazas.span(etapa):
+        limite.acquire()
+    try:
+        yield
+    finally:
+        limite.release()
+
+class LimitesServicios:
+    """Semáforos que acotan las llamadas simultáneas a cada servicio externo"""
+
+    def __init__(self, openai_max=None, unsplash_max=None, wordpress_max=None):
+        maximos = {
+            "openai": CONCURRENCIA_OPENAI if openai_max is None else openai_max,
+            "unsplash": CONCURRENCIA_UNSPLASH if unsplash_max is None else unsplash_max,
+            "wordpress": CONCURRENCIA_WORDPRESS if wordpress_max is None else wordpress_max,
+        }
+        for servicio, maximo in maximos.items():
+            if maximo < 1:
+                raise ValueError(f"La concurrencia de {servicio} debe ser al menos 1 (se indicó {maximo})")
+        self.openai = threading.BoundedSemaphore(maximos["openai"])
+        self.unsplash = threading.BoundedSemaphore(maximos["unsplash"])
+        self.wordpress = threading.BoundedSemaphore(maximos["wordpress"])
+        self.llamadas_max = sum(maximos.values())  # Llamadas simultáneas posibles entre todos los servicios
+        self._local = threading.local()
+
+    def cliente_wordpress(self):
+        """Devuelve un cliente XML-RPC propio del hilo actual (el transporte no es seguro entre hilos)"""
+        client = getattr(self._local, "client", None)
+        if client is None:
+            from wordpress_xmlrpc import Client
+
+            client = Client(WP_URL, WP_USER, WP_PASSWORD, transport=TransporteXMLRPC(WP_URL))
+            self._local.client = client
+        return client
+
+def obtener_imagen_destacada(client, titulo, palabra_clave, limites, indice=None):
+    """Busca una imagen en Unsplash para la noticia y la sube a WordPress. Devuelve su ID o None"""
+    if not palabra_clave:
+        with esperar_turno(limites.openai, "espera_openai"):
+            palabra_clave = generar_palabra_clave(titulo, limite=limites.openai)
+    with limites.unsplash:
+        imagen_url = buscar_imagen_unsplash(f"perro {palabra_clave}", width=1200, height=630)
+    if not imagen_url:
+        return None
+    imagen_id = subir_imagen(client, imagen_url, indice, limite=limites.wordpress)
+    if imagen_id:
+        logging.info("Imagen destacada para %s: %s", titulo, imagen_url)
+    return imagen_id
+
+def procesar_noticia(noticia, limites, indice, fuente=None):
+    """Genera la noticia, sube su imagen y la publica con la imagen destacada. Devuelve el título generado"""
+    from wordpress_xmlrpc.methods.posts import NewPost
 
-def actualizar_noticias(client, titulos):
-    """Actualiza las entradas de noticias generadas con imágenes de Unsplash"""
+    fuente = fuente or FUENTE_POR_DEFECTO
     try:
-        for titulo in titulos:
-            palabra_clave = generar_palabra_clave(titulo)
-            query = f"perro {palabra_clave}"
-            imagen_url = buscar_imagen_unsplash(query, width=1200, height=630)
-            if imagen_url:
-                imagen_id = subir_imagen(client, imagen_url)
-                if imagen_id:
-                    posts = client.call(GetPosts({'number': 100, 'post_status': 'publish', 'post_type': 'post'}))
-                    for post in posts:
-                        if post.title == titulo:
-                            set_post_thumbnail(client, post.id, imagen_id)
-                            logging.info("Entrada actualizada: %s con imagen destacada: %s", titulo, imagen_url)
-    except Exception as e:
-        logging.error("Error al actualizar noticias: %s", e)
+        # La espera por un cupo de OpenAI queda fuera de las etapas de generación
+        with esperar_turno(limites.openai, "espera_openai"):
+            titulo, contenido_limpio, palabra_clave = generar_noticia(noticia, fuente, limite=limites.openai)
+
+        client = limites.cliente_wordpress()
+        imagen_id = obtener_imagen_destacada(client, titulo, palabra_clave, limites, indice)
+
+        # El ID devuelto por NewPost se guarda en el índice; no hace falta buscar la entrada después
+        with limites.wordpress, trazas.span("NewPost"):
+            post_id = client.call(NewPost(crear_post(titulo, contenido_limpio, imagen_id, fuente.categoria)))
+    except ValueError:
+        # Solo cuentan los fallos propios de la noticia (generación no válida); las caídas de red o de
+        # los servicios se reintentan sin penalizarla. Tras MAX_INTENTOS_NOTICIA deja de salir en pendientes()
+        indice.registrar_fallo(noticia)
+        raise
+    indice.marcar_publicada(noticia, post_id)
+    logging.info("Noticia publicada: %s con título: %s (ID %s)", noticia, titulo, post_id)
+
+    return titulo
+
+def publicar_noticias_concurrente(limites=None, indice=None, fuente=None):
+    """Publica las noticias en paralelo: cada noticia recorre su propio pipeline en un hilo.
+    Devuelve cuántas noticias fallaron"""
+    indice = indice or IndiceNoticias()
+    noticias = obtener_noticias(indice, fuente)
+    if not noticias:
+        logging.info("No se encontraron noticias nuevas.")
+        return 0
+
+    preparar_openai()
+    limites = limites or LimitesServicios()
+    titulos_generados = []
+    errores = 0
+
+    # Más hilos que llamadas simultáneas permitidas solo crearían clientes de WordPress ociosos
+    max_hilos = min(len(noticias), limites.llamadas_max)
+    with ThreadPoolExecutor(max_workers=max_hilos) as executor:
+        tareas = {executor.submit(procesar_noticia, noticia, limites, indice, fuente): noticia for noticia in noticias}
+        for tarea in as_completed(tareas):
+            try:
+                titulos_generados.append(tarea.result())
+            except Exception as e:
+                logging.error("Error al procesar la noticia %s: %s", tareas[tarea], e)
+                errores += 1
+
+    guardar_titulos(titulos_generados)
+    metricas.registrar_en_log()
+    return errores
 
 if __name__ == "__main__":
-    publicar_noticias()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Publica en WordPress artículos generados a partir de noticias")
+    parser.add_argument("--demonio", metavar="CONFIG",
+                        help="Ejecuta como proceso continuo con las fuentes del archivo JSON indicado")
+    parser.add_argument("--reintentar-fallidas", action="store_true",
+                        help="Devuelve a pendientes las noticias que agotaron sus intentos antes de ejecutar")
+    args = parser.parse_args()
+
+    if args.reintentar_fallidas:
+        logging.info("Noticias fallidas devueltas a pendientes: %d", IndiceNoticias().reactivar_fallidas())
+
+    if args.demonio:
+        from demonio import ejecutar_demonio
+
+        preparar_openai()
+        limites = LimitesServicios()
+        ejecutar_demonio(args.demonio, obtener_noticias, procesar_noticia, limites, limites.llamadas_max)
+    else:
+        try:
+            with perfilar():
+                errores = publicar_noticias()
+        finally:
+            escribir_reportes(metricas.resumen())
+        if errores:
+            # Cada noticia se procesa por separado, pero el workflow debe enterarse de que alguna falló
+            logging.error("%d noticias no se pudieron publicar", errores)
+            sys.exit(1)
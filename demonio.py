@@ -0,0 +1,145 @@
+"""Modo demonio: consulta varias fuentes a intervalos dentro de un mismo proceso con clientes ya calientes.
+
+Uso:
+    python cats_automatics_news.py --demonio fuentes.json
+
+El formato del archivo se describe en fuentes.cargar_configuracion.
+"""
+import logging
+import signal
+import threading
+import time
+from collections import OrderedDict, deque
+
+from fuentes import cargar_configuracion
+from indice_noticias import FALLIDA, IndiceNoticias
+from transporte import limitar_sitio, metricas
+from trazas import escribir_reportes
+
+
+class ColaJusta:
+    """Cola con una fila por fuente que se atiende por turnos, para que una fuente con muchas
+    noticias no retrase a las demás"""
+
+    def __init__(self):
+        self._filas = OrderedDict()
+        self._en_cola = set()  # Noticias encoladas o en proceso, para no repetirlas
+        self._condicion = threading.Condition()
+        self._detenida = False
+
+    def agregar(self, fuente, noticias):
+        """Encola las noticias de la fuente que no estén ya en la cola. Devuelve cuántas se añadieron"""
+        with self._condicion:
+            fila = self._filas.setdefault(fuente.nombre, deque())
+            nuevas = [noticia for noticia in noticias if noticia not in self._en_cola]
+            for noticia in nuevas:
+                self._en_cola.add(noticia)
+                fila.append((fuente, noticia))
+            if nuevas:
+                self._condicion.notify_all()
+            return len(nuevas)
+
+    def obtener(self):
+        """Devuelve la siguiente (fuente, noticia) por turnos, o None si la cola se detuvo"""
+        with self._condicion:
+            while True:
+                if self._detenida:
+                    return None
+                for nombre, fila in self._filas.items():
+                    if fila:
+                        self._filas.move_to_end(nombre)  # La fuente atendida pasa al final del turno
+                        return fila.popleft()
+                self._condicion.wait()
+
+    def terminar(self, noticia):
+        """Indica que la noticia ya se procesó (con éxito o no)"""
+        with self._condicion:
+            self._en_cola.discard(noticia)
+
+    def detener(self):
+        with self._condicion:
+            self._detenida = True
+            self._condicion.notify_all()
+
+
+class Demonio:
+    """Planifica las fuentes por intervalo y reparte sus noticias entre hilos de trabajo persistentes
+
+    El pipeline (obtener_noticias, procesar_noticia y sus límites) lo entrega el script principal,
+    para no importarlo de vuelta desde el punto de entrada.
+    """
+
+    def __init__(self, fuentes, obtener_noticias, procesar_noticia, limites, hilos, limites_por_sitio=None):
+        self.fuentes = fuentes
+        self.obtener_noticias = obtener_noticias
+        self.procesar_noticia = procesar_noticia
+        self.indice = IndiceNoticias()
+        self.limites = limites  # Los clientes de WordPress por hilo se reutilizan entre ciclos
+        self.cola = ColaJusta()
+        self.detener_evento = threading.Event()
+        self.hilos = hilos
+        for host, por_minuto in (limites_por_sitio or {}).items():
+            limitar_sitio(host, por_minuto)
+
+    def _trabajar(self):
+        while True:
+            elemento = self.cola.obtener()
+            if elemento is None:
+                return
+            fuente, noticia = elemento
+            try:
+                estado = self.indice.estado(noticia)
+                if estado and estado[0] == FALLIDA:
+                    logging.warning("Noticia %s de %s omitida: agotó sus %d intentos", noticia, fuente.nombre, estado[1])
+                    continue
+                self.procesar_noticia(noticia, self.limites, self.indice, fuente)
+            except Exception as e:
+                estado, intentos = self.indice.estado(noticia) or (None, 0)
+                if estado == FALLIDA:
+                    logging.error("Noticia %s de %s descartada tras %d intentos: %s", noticia, fuente.nombre, intentos, e)
+                else:
+                    logging.error("Error al procesar la noticia %s de %s (intento %d, se reintentará): %s",
+                                  noticia, fuente.nombre, intentos, e)
+            finally:
+                self.cola.terminar(noticia)
+
+    def ejecutar(self):
+        """Bucle principal; termina cuando se llama a detener() o llega SIGINT/SIGTERM"""
+        trabajadores = [threading.Thread(target=self._trabajar, name=f"trabajador-{i}", daemon=True)
+                        for i in range(self.hilos)]
+        for trabajador in trabajadores:
+            trabajador.start()
+
+        proxima = {fuente.nombre: 0.0 for fuente in self.fuentes}
+        logging.info("Demonio iniciado con %d fuentes y %d hilos", len(self.fuentes), self.hilos)
+        while not self.detener_evento.is_set():
+            consultadas = False
+            for fuente in self.fuentes:
+                if time.monotonic() < proxima[fuente.nombre]:
+                    continue
+                noticias = self.obtener_noticias(self.indice, fuente)
+                encoladas = self.cola.agregar(fuente, noticias)
+                logging.info("Fuente %s: %d noticias encoladas", fuente.nombre, encoladas)
+                proxima[fuente.nombre] = time.monotonic() + fuente.intervalo
+                consultadas = True
+
+            if consultadas:
+                escribir_reportes(metricas.resumen())
+            self.detener_evento.wait(max(0.0, min(proxima.values()) - time.monotonic()))
+
+        self.cola.detener()
+        for trabajador in trabajadores:
+            trabajador.join()
+        escribir_reportes(metricas.resumen())
+        logging.info("Demonio detenido")
+
+    def detener(self, *args):
+        self.detener_evento.set()
+
+
+def ejecutar_demonio(ruta_configuracion, obtener_noticias, procesar_noticia, limites, hilos):
+    fuentes, limites_por_sitio = cargar_configuracion(ruta_configuracion)
+    demonio = Demonio(fuentes, obtener_noticias, procesar_noticia, limites, hilos, limites_por_sitio)
+    signal.signal(signal.SIGINT, demonio.detener)
+    signal.signal(signal.SIGTERM, demonio.detener)
+    demonio.ejecutar()
@@ -0,0 +1,158 @@
+import os
+import re
+from datetime import date
+from html.parser import HTMLParser
+from typing import NamedTuple
+from urllib.parse import urljoin
+
+# Motor de extracción por defecto: "streaming" (tokenizador sin árbol) o "strainer" (BeautifulSoup parcial)
+MOTOR_EXTRACCION = os.getenv("MOTOR_EXTRACCION", "streaming")
+
+# Fechas del listado, p. ej. "12 marzo de 2025" (el mismo formato que aceptaba el script original)
+PATRON_FECHA = re.compile(r'(\d{1,2})\s+([a-z]+)\s+de\s+(\d{4})')
+
+MESES = {
+    'enero': 1, 'febrero': 2, 'marzo': 3, 'abril': 4,
+    'mayo': 5, 'junio': 6, 'julio': 7, 'agosto': 8,
+    'septiembre': 9, 'setiembre': 9, 'octubre': 10, 'noviembre': 11, 'diciembre': 12
+}
+
+ENCABEZADOS = frozenset(("h1", "h2", "h3", "h4"))
+
+
+class Noticia(NamedTuple):
+    """Noticia encontrada en una página de listado"""
+    url: str
+    fecha: date
+    titulo: str
+
+
+def parsear_fecha(texto):
+    """Convierte un texto como '12 de marzo de 2025' en un date, o None si no se reconoce"""
+    match = PATRON_FECHA.search(texto.strip().lower())
+    if not match:
+        return None
+    dia, mes, año = match.groups()
+    mes_numero = MESES.get(mes)
+    if not mes_numero:
+        return None
+    try:
+        return date(int(año), mes_numero, int(dia))
+    except ValueError:
+        return None
+
+
+def _crear_noticia(base_url, href, fecha_texto, titulo):
+    if not href or not fecha_texto:
+        return None
+    fecha = parsear_fecha(fecha_texto)
+    if fecha is None:
+        return None
+    return Noticia(urljoin(base_url, href), fecha, " ".join(titulo.split()))
+
+
+class _ExtractorArticulos(HTMLParser):
+    """Recorre el HTML como flujo de etiquetas y solo guarda lo necesario de cada <article>"""
+
+    def __init__(self, base_url):
+        super().__init__(convert_charrefs=True)
+        self.base_url = base_url
+        self.noticias = []
+        self._profundidad = 0  # Nivel de <article> anidados en el que estamos
+        self._reiniciar()
+
+    def _reiniciar(self):
+        self._href = None
+        self._fecha = []
+        self._titulo = []
+        self._texto_enlace = []
+        self._en_time = False
+        self._en_encabezado = False
+        self._en_enlace = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "article":
+            if self._profundidad == 0:
+                self._reiniciar()
+            self._profundidad += 1
+            return
+        if not self._profundidad:
+            return
+        if tag == "time" and not self._fecha:
+            self._en_time = True
+        elif tag in ENCABEZADOS and not self._titulo:
+            self._en_encabezado = True
+        elif tag == "a" and self._href is None:
+            self._href = dict(attrs).get("href")
+            self._en_enlace = True
+
+    def handle_endtag(self, tag):
+        if not self._profundidad:
+            return
+        if tag == "article":
+            self._profundidad -= 1
+            if self._profundidad == 0:
+                noticia = _crear_noticia(
+                    self.base_url,
+                    self._href,
+                    "".join(self._fecha),
+                    "".join(self._titulo) or "".join(self._texto_enlace),
+                )
+                if noticia:
+                    self.noticias.append(noticia)
+        elif tag == "time":
+            self._en_time = False
+        elif tag in ENCABEZADOS:
+            self._en_encabezado = False
+        elif tag == "a":
+            self._en_enlace = False
+
+    def handle_data(self, data):
+        if not self._profundidad:
+            return
+        if self._en_time:
+            self._fecha.append(data)
+        if self._en_encabezado:
+            self._titulo.append(data)
+        if self._en_enlace:
+            self._texto_enlace.append(data)
+
+
+def extraer_noticias_streaming(html, base_url):
+    """Extrae las noticias con un tokenizador en flujo, sin construir ningún árbol"""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8", errors="replace")
+    extractor = _ExtractorArticulos(base_url)
+    extractor.feed(html)
+    extractor.close()
+    return extractor.noticias
+
+
+def extraer_noticias_strainer(html, base_url):
+    """Extrae las noticias con BeautifulSoup construyendo solo los nodos <article>"""
+    from bs4 import BeautifulSoup, SoupStrainer  # Solo este motor necesita bs4
+
+    soup = BeautifulSoup(html, "html.parser", parse_only=SoupStrainer("article"))
+    noticias = []
+    for articulo in soup.find_all("article", recursive=False):
+        fecha_elemento = articulo.find("time")
+        enlace = articulo.find("a", href=True)
+        if not fecha_elemento or not enlace:
+            continue
+        encabezado = articulo.find(ENCABEZADOS)
+        titulo = (encabezado or enlace).get_text()
+        noticia = _crear_noticia(base_url, enlace["href"], fecha_elemento.get_text(), titulo)
+        if noticia:
+            noticias.append(noticia)
+    return noticias
+
+
+MOTORES = {
+    "streaming": extraer_noticias_streaming,
+    "strainer": extraer_noticias_strainer,
+}
+
+
+def extraer_noticias(html, base_url, motor=None):
+    """Extrae las noticias (url, fecha, título) de una página de listado"""
+    return MOTORES[motor or MOTOR_EXTRACCION](html, base_url)
@@ -0,0 +1,60 @@
+import json
+from typing import NamedTuple, Optional
+
+from indice_noticias import FUENTE_PRINCIPAL
+
+
+class Fuente(NamedTuple):
+    """Página de listado de la que se obtienen noticias y cómo publicarlas"""
+    nombre: str
+    url: str
+    categoria: str = "Noticias"
+    max_noticias: int = 2
+    intervalo: int = 900  # Segundos entre consultas en modo demonio
+    prompt: Optional[str] = None  # Plantilla con {noticia}; None usa el prompt por defecto
+
+
+def cargar_configuracion(ruta):
+    """Lee el archivo JSON de configuración del demonio. Devuelve (fuentes, límites por sitio)
+
+    Formato:
+        {
+          "limites_por_sitio": {"www.eltiempo.com": 30},
+          "fuentes": [
+            {"nombre": "eltiempo-perros", "url": "https://www.eltiempo.com/noticias/perros",
+             "categoria": "Noticias", "max_noticias": 2, "intervalo_minutos": 15,
+             "prompt": "Escribe un artículo original basado en la siguiente noticia: {noticia}"}
+          ]
+        }
+
+    Los límites por sitio son peticiones por minuto a ese host. Solo se aplican al tráfico de la sesión
+    HTTP compartida (páginas de listado, Unsplash, descarga de imágenes y WordPress); las llamadas a
+    OpenAI usan el cliente de su SDK y no pasan por ellos, así que para acotarlas se usan
+    CONCURRENCIA_OPENAI y MAX_REINTENTOS_OPENAI.
+    """
+    with open(ruta, encoding="utf-8") as archivo:
+        configuracion = json.load(archivo)
+
+    fuentes = []
+    for datos in configuracion.get("fuentes", []):
+        datos = dict(datos)
+        if "intervalo_minutos" in datos:
+            datos["intervalo"] = int(float(datos.pop("intervalo_minutos")) * 60)
+        prompt = datos.get("prompt")
+        if prompt and "{noticia}" not in prompt:
+            raise ValueError(f"El prompt de la fuente {datos.get('nombre')} debe incluir {{noticia}}")
+        fuentes.append(Fuente(**datos))
+
+    nombres = [fuente.nombre for fuente in fuentes]
+    if not fuentes:
+        raise ValueError(f"{ruta} no define ninguna fuente")
+    if len(set(nombres)) != len(nombres):
+        raise ValueError(f"{ruta} tiene nombres de fuente repetidos")
+
+    limites = {host: float(por_minuto) for host, por_minuto in configuracion.get("limites_por_sitio", {}).items()}
+    return fuentes, limites
+
+
+def fuente_por_defecto(url, max_noticias):
+    """La fuente única del modo de una sola ejecución"""
+    return Fuente(FUENTE_PRINCIPAL, url, max_noticias=max_noticias)
@@ -0,0 +1,200 @@
+import os
+import sqlite3
+import threading
+from datetime import date, datetime, timedelta
+
+# Ruta de la base de datos con las noticias ya procesadas
+INDICE_PATH = os.getenv("INDICE_NOTICIAS", "indice_noticias.db")
+
+# Intentos de publicación de una noticia antes de darla por fallida y dejar de reintentarla
+MAX_INTENTOS_NOTICIA = int(os.getenv("MAX_INTENTOS_NOTICIA", "3"))
+
+# Días que una noticia puede seguir pendiente; las más antiguas ya no se publican (0 = sin límite)
+MAX_ANTIGUEDAD_DIAS = int(os.getenv("MAX_ANTIGUEDAD_DIAS", "3"))
+
+# Estados posibles de una noticia en el índice
+PENDIENTE = "pendiente"
+PUBLICADA = "publicada"
+FALLIDA = "fallida"
+
+# Fuente a la que pertenecen las noticias cuando no se indica otra (y las registradas antes de haber varias)
+FUENTE_PRINCIPAL = "principal"
+
+
+class IndiceNoticias:
+    """Índice persistente (SQLite) de las noticias vistas, su estado de publicación y los medios subidos"""
+
+    def __init__(self, path=None):
+        self.path = path or INDICE_PATH
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS noticias (
+                url TEXT PRIMARY KEY,
+                fecha TEXT NOT NULL,
+                estado TEXT NOT NULL,
+                post_id TEXT,
+                actualizado TEXT NOT NULL,
+                fuente TEXT NOT NULL DEFAULT 'principal',
+                intentos INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS medios (
+                sha256 TEXT PRIMARY KEY,
+                attachment_id TEXT NOT NULL,
+                url TEXT,
+                creado TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS meta (
+                clave TEXT PRIMARY KEY,
+                valor TEXT
+            );
+            """
+        )
+        columnas = {fila[1] for fila in self._conn.execute("PRAGMA table_info(noticias)")}
+        if "fuente" not in columnas:  # Índices creados antes de admitir varias fuentes
+            self._conn.execute(f"ALTER TABLE noticias ADD COLUMN fuente TEXT NOT NULL DEFAULT '{FUENTE_PRINCIPAL}'")
+        if "intentos" not in columnas:  # Índices creados antes de contar los intentos fallidos
+            self._conn.execute("ALTER TABLE noticias ADD COLUMN intentos INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def cerrar(self):
+        """Cierra la conexión con la base de datos"""
+        with self._lock:
+            self._conn.close()
+
+    # --- Metadatos (cabeceras HTTP) ---
+
+    def obtener_meta(self, clave):
+        with self._lock:
+            fila = self._conn.execute("SELECT valor FROM meta WHERE clave = ?", (clave,)).fetchone()
+        return fila[0] if fila else None
+
+    def guardar_meta(self, clave, valor):
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta (clave, valor) VALUES (?, ?) "
+                "ON CONFLICT(clave) DO UPDATE SET valor = excluded.valor",
+                (clave, valor),
+            )
+            self._conn.commit()
+
+    def cabeceras_condicionales(self, url):
+        """Devuelve las cabeceras If-None-Match/If-Modified-Since guardadas para la URL"""
+        cabeceras = {}
+        etag = self.obtener_meta(f"etag:{url}")
+        last_modified = self.obtener_meta(f"last_modified:{url}")
+        if etag:
+            cabeceras["If-None-Match"] = etag
+        if last_modified:
+            cabeceras["If-Modified-Since"] = last_modified
+        return cabeceras
+
+    def guardar_cabeceras(self, url, response):
+        """Guarda el ETag y Last-Modified de una respuesta para la próxima petición condicional"""
+        if response.headers.get("ETag"):
+            self.guardar_meta(f"etag:{url}", response.headers["ETag"])
+        if response.headers.get("Last-Modified"):
+            self.guardar_meta(f"last_modified:{url}", response.headers["Last-Modified"])
+
+    def marca_de_agua(self, fuente=FUENTE_PRINCIPAL):
+        """Fecha (date) de la noticia publicada más reciente de la fuente, o None si aún no hay ninguna"""
+        with self._lock:
+            fila = self._conn.execute(
+                "SELECT MAX(fecha) FROM noticias WHERE estado = ? AND fuente = ?", (PUBLICADA, fuente)
+            ).fetchone()
+        return datetime.strptime(fila[0], "%Y-%m-%d").date() if fila[0] else None
+
+    # --- Noticias ---
+
+    def registrar_varias(self, noticias, fuente=FUENTE_PRINCIPAL):
+        """Registra como pendientes varias (url, fecha) en una sola transacción. Devuelve las nuevas"""
+        ahora = datetime.now().isoformat()
+        nuevas = []
+        with self._lock:
+            with self._conn:
+                for url, fecha in noticias:
+                    cursor = self._conn.execute(
+                        "INSERT OR IGNORE INTO noticias (url, fecha, estado, actualizado, fuente) VALUES (?, ?, ?, ?, ?)",
+                        (url, fecha.isoformat(), PENDIENTE, ahora, fuente),
+                    )
+                    if cursor.rowcount == 1:
+                        nuevas.append(url)
+        return nuevas
+
+    def pendientes(self, fuente=FUENTE_PRINCIPAL, max_dias=None):
+        """URLs de la fuente que aún no se han publicado ni agotado sus intentos, de los últimos `max_dias`.
+
+        Van de la más reciente a la más antigua, para que un listado con más noticias diarias que
+        MAX_NOTICIAS no deje la publicación cada vez más atrasada; a igual fecha, las que no han fallado.
+        """
+        max_dias = MAX_ANTIGUEDAD_DIAS if max_dias is None else max_dias
+        desde = (date.today() - timedelta(days=max_dias)).isoformat() if max_dias else ""
+        with self._lock:
+            filas = self._conn.execute(
+                "SELECT url FROM noticias WHERE estado = ? AND fuente = ? AND fecha >= ? "
+                "ORDER BY fecha DESC, intentos, actualizado",
+                (PENDIENTE, fuente, desde),
+            ).fetchall()
+        return [fila[0] for fila in filas]
+
+    def marcar_publicada(self, url, post_id):
+        """Marca una noticia como publicada (lo que avanza la marca de agua de su fuente)"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE noticias SET estado = ?, post_id = ?, actualizado = ? WHERE url = ?",
+                (PUBLICADA, str(post_id), datetime.now().isoformat(), url),
+            )
+            self._conn.commit()
+
+    def registrar_fallo(self, url, max_intentos=None):
+        """Suma un intento fallido por causa de la noticia y la marca como fallida al llegar al máximo.
+        Devuelve los intentos acumulados"""
+        max_intentos = max_intentos or MAX_INTENTOS_NOTICIA
+        with self._lock:
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE noticias SET intentos = intentos + 1, actualizado = ? WHERE url = ? AND estado = ?",
+                    (datetime.now().isoformat(), url, PENDIENTE),
+                )
+                self._conn.execute(
+                    "UPDATE noticias SET estado = ? WHERE url = ? AND estado = ? AND intentos >= ?",
+                    (FALLIDA, url, PENDIENTE, max_intentos),
+                )
+                fila = self._conn.execute("SELECT intentos FROM noticias WHERE url = ?", (url,)).fetchone()
+        return fila[0] if fila else 0
+
+    def reactivar_fallidas(self, fuente=None):
+        """Devuelve a pendientes (con los intentos a cero) las noticias fallidas. Devuelve cuántas"""
+        consulta = "UPDATE noticias SET estado = ?, intentos = 0, actualizado = ? WHERE estado = ?"
+        parametros = [PENDIENTE, datetime.now().isoformat(), FALLIDA]
+        if fuente is not None:
+            consulta += " AND fuente = ?"
+            parametros.append(fuente)
+        with self._lock:
+            with self._conn:
+                cursor = self._conn.execute(consulta, parametros)
+        return cursor.rowcount
+
+    def estado(self, url):
+        """(estado, intentos) de la noticia, o None si no está en el índice"""
+        with self._lock:
+            fila = self._conn.execute("SELECT estado, intentos FROM noticias WHERE url = ?", (url,)).fetchone()
+        return tuple(fila) if fila else None
+
+    # --- Medios subidos a WordPress ---
+
+    def obtener_medio(self, sha256):
+        """ID del adjunto de WordPress ya subido con este contenido, o None"""
+        with self._lock:
+            fila = self._conn.execute("SELECT attachment_id FROM medios WHERE sha256 = ?", (sha256,)).fetchone()
+        return fila[0] if fila else None
+
+    def guardar_medio(self, sha256, attachment_id, url=None):
+        """Registra el adjunto de WordPress correspondiente a un contenido"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO medios (sha256, attachment_id, url, creado) VALUES (?, ?, ?, ?)",
+                (sha256, str(attachment_id), url, datetime.now().isoformat()),
+            )
+            self._conn.commit()
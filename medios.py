@@ -0,0 +1,84 @@
+import hashlib
+import logging
+import os
+import tempfile
+
+from transporte import obtener_sesion
+
+# Tamaño y calidad de la imagen destacada
+ANCHO_IMAGEN = 1200
+ALTO_IMAGEN = 630
+CALIDAD_JPEG = int(os.getenv("CALIDAD_JPEG", "82"))
+TAMAÑO_BLOQUE = 64 * 1024  # Bytes leídos por bloque al descargar
+
+
+class ImagenDescargada:
+    """Imagen guardada en un archivo temporal junto con el hash de su contenido"""
+
+    def __init__(self, ruta, sha256, tipo):
+        self.ruta = ruta
+        self.sha256 = sha256
+        self.tipo = tipo
+
+    @property
+    def tamaño(self):
+        return os.path.getsize(self.ruta)
+
+    def leer(self):
+        with open(self.ruta, "rb") as archivo:
+            return archivo.read()
+
+    def eliminar(self):
+        try:
+            os.remove(self.ruta)
+        except OSError:
+            pass
+
+
+def descargar_imagen(imagen_url, session=None):
+    """Descarga la imagen por bloques a un archivo temporal, calculando su hash mientras llega"""
+    http = session or obtener_sesion()
+    sha256 = hashlib.sha256()
+    with http.get(imagen_url, stream=True) as response:
+        response.raise_for_status()
+        tipo = response.headers.get("Content-Type", "image/jpeg").split(";")[0]
+        descriptor, ruta = tempfile.mkstemp(suffix=".img")
+        try:
+            with os.fdopen(descriptor, "wb") as archivo:
+                for bloque in response.iter_content(TAMAÑO_BLOQUE):
+                    sha256.update(bloque)
+                    archivo.write(bloque)
+        except Exception:
+            os.remove(ruta)
+            raise
+    return ImagenDescargada(ruta, sha256.hexdigest(), tipo)
+
+
+def redimensionar_imagen(imagen, ancho=ANCHO_IMAGEN, alto=ALTO_IMAGEN, calidad=CALIDAD_JPEG):
+    """Recorta y recomprime la imagen a JPEG del tamaño indicado. Devuelve una nueva ImagenDescargada
+
+    Si Pillow no está instalado o la imagen no se puede abrir, devuelve la original.
+    """
+    try:
+        from PIL import Image, ImageOps  # Se importa al usarse para no cargarlo en el arranque
+    except ImportError:  # Sin Pillow se sube la imagen tal como la entrega Unsplash
+        return imagen
+
+    descriptor, ruta = tempfile.mkstemp(suffix=".jpg")
+    os.close(descriptor)
+    try:
+        with Image.open(imagen.ruta) as original:
+            original.draft("RGB", (ancho, alto))  # Decodifica JPEG grandes a menor escala directamente
+            recortada = ImageOps.fit(original.convert("RGB"), (ancho, alto), method=Image.LANCZOS)
+            recortada.save(ruta, "JPEG", quality=calidad, optimize=True, progressive=True)
+    except OSError as e:
+        logging.warning("No se pudo redimensionar la imagen, se sube la original: %s", e)
+        os.remove(ruta)
+        return imagen
+    return ImagenDescargada(ruta, imagen.sha256, "image/jpeg")
+
+
+def nombre_archivo(imagen):
+    """Nombre estable en la biblioteca de medios a partir del hash del contenido"""
+    extension = ".jpg" if imagen.tipo == "image/jpeg" else "." + imagen.tipo.split("/")[-1]
+    return f"perro-{imagen.sha256[:16]}{extension}"
@@ -0,0 +1,207 @@
+import logging
+import os
+import random
+import threading
+import time
+import xmlrpc.client as xmlrpc_client
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from trazas import trazas
+
+# Configuración del transporte HTTP compartido
+HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+HTTP_REINTENTOS = int(os.getenv("HTTP_REINTENTOS", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))  # Segundos de espera base entre reintentos
+HTTP_POOL = int(os.getenv("HTTP_POOL", "10"))  # Conexiones keep-alive por host
+ESTADOS_REINTENTABLES = (429, 500, 502, 503, 504)
+
+_sesion = None
+_sesion_lock = threading.Lock()
+_limites_sitio = {}
+
+
+class ReintentoConJitter(Retry):
+    """Retry de urllib3 con espera exponencial más un componente aleatorio, que cuenta cada reintento"""
+
+    def increment(self, *args, **kwargs):
+        nuevo = super().increment(*args, **kwargs)  # Lanza MaxRetryError si ya no quedan reintentos
+        trazas.sumar("http.reintentos")
+        return nuevo
+
+    def get_backoff_time(self):
+        espera = super().get_backoff_time()
+        return espera + random.uniform(0, self.backoff_factor) if espera else 0
+
+
+class LimiteTasa:
+    """Cubeta de fichas: como mucho `por_minuto` peticiones por minuto a un sitio"""
+
+    def __init__(self, por_minuto, rafaga=1):
+        self.intervalo = 60.0 / por_minuto
+        self.rafaga = rafaga
+        self._fichas = float(rafaga)
+        self._ultima = time.monotonic()
+        self._lock = threading.Lock()
+
+    def esperar(self):
+        """Bloquea hasta que haya una ficha disponible y la consume"""
+        while True:
+            with self._lock:
+                ahora = time.monotonic()
+                self._fichas = min(self.rafaga, self._fichas + (ahora - self._ultima) / self.intervalo)
+                self._ultima = ahora
+                if self._fichas >= 1:
+                    self._fichas -= 1
+                    return
+                espera = (1 - self._fichas) * self.intervalo
+            time.sleep(espera)
+
+
+def limitar_sitio(host, por_minuto):
+    """Limita las peticiones de todo el proceso a `host` (p. ej. 'www.eltiempo.com') hechas con la sesión compartida"""
+    _limites_sitio[host] = LimiteTasa(por_minuto)
+
+
+class AdaptadorConTimeout(HTTPAdapter):
+    """HTTPAdapter que aplica un timeout de conexión/lectura cuando la llamada no indica uno
+    y respeta los límites de tasa por sitio"""
+
+    def __init__(self, timeout=None, **kwargs):
+        self.timeout = timeout or (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        limite = _limites_sitio.get(urlparse(request.url).netloc)
+        if limite:
+            limite.esperar()
+        return super().send(request, **kwargs)
+
+
+class MetricasHTTP:
+    """Contadores por host de peticiones, errores, latencia y bytes enviados/recibidos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hosts = {}
+
+    def registrar(self, host, segundos, bytes_enviados, bytes_recibidos, error=False):
+        with self._lock:
+            datos = self.hosts.setdefault(host, {
+                "peticiones": 0, "errores": 0, "segundos": 0.0, "max_segundos": 0.0,
+                "bytes_enviados": 0, "bytes_recibidos": 0,
+            })
+            datos["peticiones"] += 1
+            datos["errores"] += int(error)
+            datos["segundos"] += segundos
+            datos["max_segundos"] = max(datos["max_segundos"], segundos)
+            datos["bytes_enviados"] += bytes_enviados
+            datos["bytes_recibidos"] += bytes_recibidos
+
+    def resumen(self):
+        """Copia de los contadores, con la latencia media por host"""
+        with self._lock:
+            resumen = {host: dict(datos) for host, datos in self.hosts.items()}
+        for datos in resumen.values():
+            datos["media_segundos"] = datos["segundos"] / datos["peticiones"]
+        return resumen
+
+    def registrar_en_log(self):
+        for host, datos in sorted(self.resumen().items()):
+            logging.info(
+                "HTTP %s: %d peticiones, %d errores, media %.3fs, máx %.3fs, %d bytes enviados, %d bytes recibidos",
+                host, datos["peticiones"], datos["errores"], datos["media_segundos"], datos["max_segundos"],
+                datos["bytes_enviados"], datos["bytes_recibidos"],
+            )
+
+
+metricas = MetricasHTTP()
+
+
+def _registrar_respuesta(response, *args, **kwargs):
+    """Hook de requests: anota latencia y tamaño de cada respuesta en las métricas por host"""
+    if kwargs.get("stream"):
+        # No se lee el cuerpo para no romper la descarga por bloques
+        recibidos = int(response.headers.get("Content-Length") or 0)
+    else:
+        recibidos = len(response.content)
+    cuerpo = response.request.body
+    enviados = len(cuerpo) if isinstance(cuerpo, (bytes, str)) else 0
+    metricas.registrar(
+        urlparse(response.url).netloc,
+        response.elapsed.total_seconds(),
+        enviados,
+        recibidos,
+        error=response.status_code >= 400,
+    )
+
+
+def crear_sesion(reintentos=None, backoff=None, pool=None, timeout=None):
+    """Crea una sesión keep-alive con timeouts, reintentos con jitter y métricas por host"""
+    reintento = ReintentoConJitter(
+        total=HTTP_REINTENTOS if reintentos is None else reintentos,
+        backoff_factor=HTTP_BACKOFF if backoff is None else backoff,
+        status_forcelist=ESTADOS_REINTENTABLES,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adaptador = AdaptadorConTimeout(
+        timeout=timeout,
+        max_retries=reintento,
+        pool_connections=pool or HTTP_POOL,
+        pool_maxsize=pool or HTTP_POOL,
+    )
+    session = requests.Session()
+    session.mount("https://", adaptador)
+    session.mount("http://", adaptador)
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    session.hooks["response"].append(_registrar_respuesta)
+    return session
+
+
+def obtener_sesion():
+    """Devuelve la sesión HTTP compartida por todo el proceso"""
+    global _sesion
+    with _sesion_lock:
+        if _sesion is None:
+            _sesion = crear_sesion()
+        return _sesion
+
+
+class TransporteXMLRPC(xmlrpc_client.Transport):
+    """Transporte XML-RPC sobre la sesión compartida (conexiones keep-alive, gzip, timeouts y métricas)
+
+    Las llamadas XML-RPC son POST y no se reintentan automáticamente, para no duplicar entradas
+    si WordPress llegó a procesar la petición.
+    """
+
+    def __init__(self, url, session=None):
+        super().__init__()
+        self.esquema = urlparse(url).scheme or "https"
+        self.session = session or obtener_sesion()
+
+    def request(self, host, handler, request_body, verbose=False):
+        url = f"{self.esquema}://{host}{handler}"
+        inicio = time.perf_counter()
+        try:
+            response = self.session.post(
+                url,
+                data=request_body,
+                headers={"Content-Type": "text/xml", "User-Agent": self.user_agent},
+            )
+        except requests.exceptions.RequestException as e:
+            metricas.registrar(host, time.perf_counter() - inicio, len(request_body), 0, error=True)
+            raise xmlrpc_client.ProtocolError(url, 0, str(e), {})
+        if response.status_code != 200:
+            raise xmlrpc_client.ProtocolError(url, response.status_code, response.reason, dict(response.headers))
+
+        parser, unmarshaller = self.getparser()
+        parser.feed(response.content)
+        parser.close()
+        return unmarshaller.close()
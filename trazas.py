@@ -0,0 +1,207 @@
+import cProfile
+import functools
+import io
+import json
+import logging
+import math
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+# Archivos del informe de la ejecución y perfilado opcional ("cprofile" o "tracemalloc")
+REPORTE_JSON = os.getenv("REPORTE_JSON", "reporte_ejecucion.json")
+REPORTE_PROMETHEUS = os.getenv("REPORTE_PROMETHEUS", "metricas_noticias.prom")
+PERFILAR = os.getenv("PERFILAR", "")
+PERFIL_PATH = os.getenv("PERFIL_PATH", "perfil_noticias.pstats")
+MUESTRAS_LATENCIA = int(os.getenv("MUESTRAS_LATENCIA", "1000"))  # Latencias recientes por etapa para p50/p95
+
+
+def percentil(valores, p):
+    """Percentil p (0-100) por el método del rango más cercano"""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    return ordenados[max(0, math.ceil(p / 100 * len(ordenados)) - 1)]
+
+
+class Trazas:
+    """Latencias por etapa del pipeline y contadores (reintentos, tokens, bytes) de una ejecución
+
+    De cada etapa se acumulan llamadas, total y máximo, pero solo se guardan las últimas
+    MUESTRAS_LATENCIA latencias, para que un proceso de larga duración no crezca sin límite.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.inicio = time.time()
+        self.etapas = {}
+        self.contadores = {}
+        self.medidas = {}  # Valores puntuales (gauges), p. ej. la memoria pico
+
+    def registrar(self, etapa, segundos, error=False):
+        with self._lock:
+            datos = self.etapas.setdefault(etapa, {
+                "latencias": deque(maxlen=MUESTRAS_LATENCIA), "llamadas": 0, "errores": 0, "total": 0.0, "max": 0.0,
+            })
+            datos["latencias"].append(segundos)
+            datos["llamadas"] += 1
+            datos["errores"] += int(error)
+            datos["total"] += segundos
+            datos["max"] = max(datos["max"], segundos)
+
+    def sumar(self, contador, valor=1):
+        """Incrementa un contador, p. ej. 'openai.reintentos' o 'wordpress.bytes_subidos'"""
+        with self._lock:
+            self.contadores[contador] = self.contadores.get(contador, 0) + valor
+
+    def fijar(self, medida, valor):
+        """Guarda el valor actual de una medida que no es acumulativa, p. ej. 'memoria.pico_bytes'"""
+        with self._lock:
+            self.medidas[medida] = valor
+
+    @contextmanager
+    def span(self, etapa):
+        """Mide el tiempo de un bloque como una ejecución de la etapa"""
+        inicio = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.registrar(etapa, time.perf_counter() - inicio, error)
+
+    def resumen(self):
+        """Resumen por etapa: llamadas, errores, total, media, p50, p95 y máximo (segundos).
+        Los percentiles se calculan sobre las últimas MUESTRAS_LATENCIA llamadas"""
+        with self._lock:
+            etapas = {etapa: dict(datos, latencias=list(datos["latencias"])) for etapa, datos in self.etapas.items()}
+            contadores = dict(self.contadores)
+            medidas = dict(self.medidas)
+        resumen = {}
+        for etapa, datos in sorted(etapas.items()):
+            resumen[etapa] = {
+                "llamadas": datos["llamadas"],
+                "errores": datos["errores"],
+                "total": datos["total"],
+                "media": datos["total"] / datos["llamadas"],
+                "p50": percentil(datos["latencias"], 50),
+                "p95": percentil(datos["latencias"], 95),
+                "max": datos["max"],
+            }
+        return {
+            "inicio": datetime.fromtimestamp(self.inicio).isoformat(),
+            "duracion": time.time() - self.inicio,
+            "etapas": resumen,
+            "contadores": contadores,
+            "medidas": medidas,
+        }
+
+
+trazas = Trazas()
+
+
+def trazar(etapa):
+    """Decorador que registra cada llamada a la función como un span de la etapa"""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        def envoltura(*args, **kwargs):
+            with trazas.span(etapa):
+                return funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+
+def _nombre_metrica(texto):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", texto)
+
+
+def formato_prometheus(resumen, http=None):
+    """Convierte el resumen (y las métricas HTTP por host) al formato de texto de Prometheus"""
+    lineas = [
+        "# HELP noticias_etapa_segundos Latencia de cada etapa del pipeline.",
+        "# TYPE noticias_etapa_segundos summary",
+    ]
+    for etapa, datos in resumen["etapas"].items():
+        for cuantil, clave in (("0.5", "p50"), ("0.95", "p95")):
+            lineas.append(f'noticias_etapa_segundos{{etapa="{etapa}",quantile="{cuantil}"}} {datos[clave]:.6f}')
+        lineas.append(f'noticias_etapa_segundos_sum{{etapa="{etapa}"}} {datos["total"]:.6f}')
+        lineas.append(f'noticias_etapa_segundos_count{{etapa="{etapa}"}} {datos["llamadas"]}')
+    lineas.append("# HELP noticias_etapa_errores_total Llamadas de cada etapa que terminaron con excepción.")
+    lineas.append("# TYPE noticias_etapa_errores_total counter")
+    for etapa, datos in resumen["etapas"].items():
+        lineas.append(f'noticias_etapa_errores_total{{etapa="{etapa}"}} {datos["errores"]}')
+
+    for contador, valor in sorted(resumen["contadores"].items()):
+        nombre = f"noticias_{_nombre_metrica(contador)}_total"
+        lineas.append(f"# TYPE {nombre} counter")
+        lineas.append(f"{nombre} {valor}")
+
+    for medida, valor in sorted(resumen["medidas"].items()):
+        nombre = f"noticias_{_nombre_metrica(medida)}"
+        lineas.append(f"# TYPE {nombre} gauge")
+        lineas.append(f"{nombre} {valor}")
+
+    for clave in ("peticiones", "errores", "segundos", "bytes_enviados", "bytes_recibidos") if http else ():
+        nombre = f"noticias_http_{clave}_total"
+        lineas.append(f"# TYPE {nombre} counter")
+        for host, datos in sorted(http.items()):
+            lineas.append(f'{nombre}{{host="{host}"}} {datos[clave]}')
+
+    lineas.append("# TYPE noticias_ejecucion_segundos gauge")
+    lineas.append(f"noticias_ejecucion_segundos {resumen['duracion']:.6f}")
+    return "\n".join(lineas) + "\n"
+
+
+def escribir_reportes(http=None, ruta_json=None, ruta_prometheus=None):
+    """Escribe el resumen de la ejecución en JSON y en formato Prometheus"""
+    resumen = trazas.resumen()
+    if http is not None:
+        resumen["http"] = http
+    ruta_json = ruta_json or REPORTE_JSON
+    ruta_prometheus = ruta_prometheus or REPORTE_PROMETHEUS
+    try:
+        with open(ruta_json, "w", encoding="utf-8") as archivo:
+            json.dump(resumen, archivo, indent=2, ensure_ascii=False)
+        with open(ruta_prometheus, "w", encoding="utf-8") as archivo:
+            archivo.write(formato_prometheus(resumen, http))
+    except OSError as e:
+        logging.error("No se pudo escribir el reporte de la ejecución: %s", e)
+    return resumen
+
+
+@contextmanager
+def perfilar(modo=None):
+    """Perfila el bloque con cProfile o tracemalloc según `modo` (por defecto la variable PERFILAR)"""
+    modo = PERFILAR if modo is None else modo
+    if modo == "cprofile":
+        perfil = cProfile.Profile()
+        perfil.enable()
+        try:
+            yield
+        finally:
+            perfil.disable()
+            perfil.dump_stats(PERFIL_PATH)
+            salida = io.StringIO()
+            pstats.Stats(perfil, stream=salida).sort_stats("cumulative").print_stats(20)
+            logging.info("Perfil cProfile (guardado en %s):\n%s", PERFIL_PATH, salida.getvalue())
+    elif modo == "tracemalloc":
+        tracemalloc.start(25)
+        try:
+            yield
+        finally:
+            instantanea = tracemalloc.take_snapshot()
+            _, pico = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            trazas.fijar("memoria.pico_bytes", pico)
+            lineas = "\n".join(str(estadistica) for estadistica in instantanea.statistics("lineno")[:20])
+            logging.info("Memoria pico: %d bytes. Líneas con más memoria asignada:\n%s", pico, lineas)
+    else:
+        yield